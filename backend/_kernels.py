@@ -0,0 +1,116 @@
+"""
+Numba-compiled numeric kernels for the weather analysis endpoints
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Without Numba (e.g. under PyPy) the kernels run as plain Python/NumPy
+    def njit(func=None, **options):
+        """No-op stand-in for numba.njit, bare or called with options."""
+        if func is None:
+            return lambda f: f
+        return func
+
+
+@njit(cache=True)
+def _percentile_sorted(sorted_values, q):
+    """Linear-interpolated percentile of an already sorted array (same arithmetic as np.percentile)."""
+    n = sorted_values.size
+    virtual_index = (n - 1) * (q / 100.0)
+    lower = int(np.floor(virtual_index))
+    if lower < 0:
+        return np.float64(sorted_values[0])
+    if lower >= n - 1:
+        return np.float64(sorted_values[n - 1])
+    gamma = virtual_index - lower
+    below = np.float64(sorted_values[lower])
+    above = np.float64(sorted_values[lower + 1])
+    diff = above - below
+    if gamma >= 0.5:
+        return above - diff * (1.0 - gamma)
+    return below + diff * gamma
+
+
+@njit(cache=True)
+def _summarize(selected, count):
+    """Statistics of selected[:count], given in date order."""
+    if count == 0:
+        return selected[:0], 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+
+    # Plain float64 accumulation; one value per year keeps it well within precision
+    total = np.float64(0.0)
+    for i in range(count):
+        total += selected[i]
+    day_values = np.sort(selected[:count])
+
+    middle = count // 2
+    if count % 2 == 1:
+        median = day_values[middle]
+    else:
+        median = (np.float64(day_values[middle - 1]) + np.float64(day_values[middle])) / 2.0
+
+    return (
+        day_values,
+        _percentile_sorted(day_values, 10.0),
+        _percentile_sorted(day_values, 25.0),
+        _percentile_sorted(day_values, 75.0),
+        _percentile_sorted(day_values, 90.0),
+        total / count,
+        median,
+        day_values[0],
+        day_values[count - 1],
+    )
+
+
+# nogil: table builds running on other gunicorn threads can use the
+# interpreter while these loops run
+@njit(cache=True, nogil=True)
+def day_stats_kernel(values):
+    """Summarize one calendar day's values across all years (in date order).
+
+    Values equal to the -999 fill value or NaN are ignored. The sample keeps the
+    dtype of values (float32 from the endpoints); the mean, median and
+    percentiles are computed in float64. Returns a tuple of
+    (sorted_day_values, p10, p25, p75, p90, mean, median, minimum, maximum).
+    """
+    selected = np.empty(values.size, dtype=values.dtype)
+    count = 0
+    for i in range(values.size):
+        value = values[i]
+        if value == -999.0 or value != value:
+            continue
+        selected[count] = value
+        count += 1
+    return _summarize(selected, count)
+
+
+@njit(cache=True, nogil=True)
+def analyze_kernel(keys, values, mask):
+    """Summarize the values selected by mask (one month/day across all years) of a YYYYMMDD series.
+
+    Same filtering and statistics as day_stats_kernel, for callers holding the
+    whole series. Returns day_stats_kernel's tuple followed by first_year and
+    last_year of the valid values; first_year is -1 when there are none.
+    """
+    n = keys.size
+    selected = np.empty(n, dtype=values.dtype)
+    count = 0
+    first_year = -1
+    last_year = -1
+    for i in range(n):
+        value = values[i]
+        if value == -999.0 or value != value:
+            continue
+        year = keys[i] // 10000
+        if first_year == -1 or year < first_year:
+            first_year = year
+        if year > last_year:
+            last_year = year
+        if mask[i]:
+            selected[count] = value
+            count += 1
+
+    return _summarize(selected, count) + (first_year, last_year)
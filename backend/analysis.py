@@ -0,0 +1,150 @@
+"""
+Day-of-year temperature analysis shared by the backend test scripts
+"""
+
+import threading
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+from _kernels import analyze_kernel
+
+
+def timeseries_arrays(timeseries):
+    """Converts a NASA {YYYYMMDD: value} series into (int32 keys, float32 values) arrays.
+
+    NASA reports one or two decimals, so float32 holds every reading; the
+    statistics are still accumulated in float64 by the kernel. A JSON null is
+    stored as NaN by np.fromiter and dropped along with the -999 fill value,
+    so no per-value None check is needed.
+    """
+    key_ints = np.fromiter(timeseries.keys(), dtype=np.int32, count=len(timeseries))
+    temps = np.fromiter(timeseries.values(), dtype=np.float32, count=len(timeseries))
+    return key_ints, temps
+
+
+# Decoded MMDD arrays for recently analyzed key arrays, so scanning many days
+# of one series decodes its keys once. Entries hold the key array itself, which
+# keeps its id from being reused while cached.
+DECODED_KEYS_CACHE_SIZE = 8
+_DECODED_KEYS = OrderedDict()
+_DECODED_KEYS_LOCK = threading.Lock()
+
+
+def month_day_codes(key_ints):
+    """MMDD codes (key % 10000) of a YYYYMMDD key array, memoized per array."""
+    if key_ints.size == 0:
+        return key_ints % 10000
+    # Size and first/last key catch an array modified in place since it was cached
+    cache_key = (id(key_ints), key_ints.size, int(key_ints[0]), int(key_ints[-1]))
+    with _DECODED_KEYS_LOCK:
+        entry = _DECODED_KEYS.get(cache_key)
+        if entry is not None and entry[0] is key_ints:
+            _DECODED_KEYS.move_to_end(cache_key)
+            return entry[1]
+
+    month_day = key_ints % 10000
+    with _DECODED_KEYS_LOCK:
+        _DECODED_KEYS[cache_key] = (key_ints, month_day)
+        while len(_DECODED_KEYS) > DECODED_KEYS_CACHE_SIZE:
+            _DECODED_KEYS.popitem(last=False)
+    return month_day
+
+
+def analyze_timeseries(timeseries, month, day, debug=False, min_points=5):
+    """Takes the full timeseries (dict or (keys, temps) arrays) and analyzes data for a specific day of the year.
+
+    Returns None when fewer than min_points valid readings fall on the day.
+    debug=True prints each filtering step; nothing is formatted otherwise.
+    """
+    if debug:
+        print(f"🔍 Debug: Analyzing data for {month:02d}/{day:02d}")
+
+    try:
+        # Callers that already hold the arrays pass them directly (and reuse
+        # the decoded keys when analyzing several days of one series); arrays
+        # built from a dict here are used once, so they skip the cache
+        if isinstance(timeseries, dict):
+            key_ints, temps = timeseries_arrays(timeseries)
+            month_day = key_ints % 10000
+        else:
+            key_ints, temps = timeseries
+            month_day = month_day_codes(key_ints)
+        on_day = month_day == month * 100 + day
+
+        if debug:
+            print(f"📊 Total data points: {len(key_ints)}")
+            print(f"📅 Date range: {datetime.strptime(str(key_ints.min()), '%Y%m%d')} to {datetime.strptime(str(key_ints.max()), '%Y%m%d')}")
+
+            # NASA uses -999 for missing data; a JSON null parses as NaN
+            valid = (temps != -999.0) & ~np.isnan(temps)
+            print(f"✅ Valid data points after filtering: {np.count_nonzero(valid)}")
+            if not valid.any():
+                print("❌ No valid data after filtering")
+                return None
+
+            print(f"🔍 Filtering for month {month}, day {day}")
+            daily_temps = temps[valid & on_day]
+            print(f"📊 Daily data for {month:02d}/{day:02d}: {len(daily_temps)} points")
+            if len(daily_temps):
+                print(f"📈 Daily temperatures: {daily_temps}")
+            else:
+                print(f"❌ No data found for {month:02d}/{day:02d}")
+
+        # Compiled kernel shared with the app: drops -999 readings, selects the
+        # month/day across all years and returns the sorted sample with its
+        # statistics in one pass (NASA values are finite, so its percentile
+        # interpolation never meets the inf case np.percentile mishandles).
+        # float() because the no-Numba fallback returns NumPy scalars
+        (sorted_temps, very_cold, cold, hot, very_hot, mean, median,
+         min_temp, max_temp, first_year, last_year) = analyze_kernel(key_ints, temps, on_day)
+        n = len(sorted_temps)
+
+        if n == 0:
+            return None
+        if n < min_points:
+            if debug:
+                print(f"❌ Not enough data points ({n} < {min_points})")
+            return None
+
+        analysis = {
+            "very_cold_threshold": round(float(very_cold), 2),
+            "cold_threshold": round(float(cold), 2),
+            "hot_threshold": round(float(hot), 2),
+            "very_hot_threshold": round(float(very_hot), 2),
+            "average_temp": round(float(mean), 2),
+            "median_temp": round(float(median), 2),
+            "min_temp": round(float(min_temp), 2),
+            "max_temp": round(float(max_temp), 2),
+            "data_points": n,
+            "unit": "°C",
+            "date_analyzed": f"{month:02d}/{day:02d}",
+            "years_of_data": f"{first_year}-{last_year}"
+        }
+
+        # Calculate probabilities for different conditions (binary searches on the sorted temperatures).
+        # Thresholds are cast to the sample dtype so a reading equal to one still counts
+        upper = np.array([analysis["very_hot_threshold"], analysis["hot_threshold"]], dtype=sorted_temps.dtype)
+        lower = np.array([analysis["cold_threshold"], analysis["very_cold_threshold"]], dtype=sorted_temps.dtype)
+        at_or_above = n - np.searchsorted(sorted_temps, upper, side='left')
+        at_or_below = np.searchsorted(sorted_temps, lower, side='right')
+        very_hot_prob, hot_prob = (at_or_above / n * 100).tolist()
+        cold_prob, very_cold_prob = (at_or_below / n * 100).tolist()
+
+        analysis.update({
+            "very_hot_probability": round(very_hot_prob, 1),
+            "hot_probability": round(hot_prob, 1),
+            "cold_probability": round(cold_prob, 1),
+            "very_cold_probability": round(very_cold_prob, 1)
+        })
+
+        return analysis
+
+    except Exception as e:
+        if debug:
+            print(f"❌ Error in analysis: {str(e)}")
+            traceback.print_exc()
+        else:
+            print(f"Error analyzing timeseries: {str(e)}")
+        return None
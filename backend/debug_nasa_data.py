@@ -5,6 +5,7 @@ Debug script to inspect NASA API data structure
 
 import requests
 import json
+import orjson
 
 def inspect_nasa_data():
     """Inspect the structure of NASA POWER API data"""
@@ -29,7 +30,7 @@ def inspect_nasa_data():
     try:
         response = requests.get(POWER_API_URL, params=params, timeout=30)
         response.raise_for_status()
-        nasa_data = response.json()
+        nasa_data = orjson.loads(response.content)
         
         print("✅ NASA API connection successful!")
         print(f"📊 Full response keys: {list(nasa_data.keys())}")
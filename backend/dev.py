@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Local development server for the NASA Weather Analyzer API
+Uses Flask's single-process debug server; deploy with gunicorn.conf.py instead
+"""
+
+from simple_app import app
+
+if __name__ == '__main__':
+    print("🚀 Starting NASA Weather Analyzer API Server...")
+    print("🔗 Server will be available at: http://127.0.0.1:5000")
+    print("📊 API endpoint: http://127.0.0.1:5000/api/analyze")
+    print("❤️ Health check: http://127.0.0.1:5000/api/health")
+    app.run(debug=True, host='127.0.0.1', port=5000)
@@ -1,6 +1,11 @@
 import os
 import json
+import time
+import string
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from typing import List, Any, Dict, Optional
 import requests
 
@@ -37,6 +42,8 @@ class OpenRouterClient:
         self.api_key = api_key
         self.model = model
         self.temperature = temperature
+        # Reused across calls so back-to-back completions share one TLS connection
+        self._session = requests.Session()
 
     def chat(self, prompt: str) -> str:
         if not self.api_key:
@@ -53,13 +60,20 @@ class OpenRouterClient:
             "temperature": self.temperature
         }
 
-        resp = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data, timeout=60)
-        try:
-            resp.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"OpenRouter API request failed: {e} - {resp.text if resp is not None else ''}")
+        # Fail fast (5s) when OpenRouter is unreachable; once connected, allow
+        # up to 60s between bytes while the model generates its reply
+        with self._session.post(
+            "https://openrouter.ai/api/v1/chat/completions",
+            headers=headers, json=data, stream=True, timeout=(5, 60)
+        ) as resp:
+            try:
+                resp.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                raise RuntimeError(f"OpenRouter API request failed: {e} - {resp.text}")
 
-        data = resp.json()
+            body = b"".join(resp.iter_content(chunk_size=8192))
+
+        data = json.loads(body)
         # Expect the assistant message in choices[0].message.content
         try:
             return data["choices"][0]["message"]["content"]
@@ -69,6 +83,10 @@ class OpenRouterClient:
 
 class GenAIWeatherForecaster:
     """Class to handle GenAI-powered weather forecasting."""
+
+    # Parsed model responses are memoized per prompt so identical requests skip the LLM call
+    CACHE_TTL_SECONDS = 24 * 60 * 60
+    CACHE_MAX_ENTRIES = 256
     
     def __init__(self, api_key=None, model_name=None):
         """Initialize the forecaster with API key and model."""
@@ -90,14 +108,53 @@ class GenAIWeatherForecaster:
             "DATE OF INTEREST: {date}\n\n"
             "Provide the response strictly as a JSON object. Avoid additional commentary.\n"
         )
+        # Parsed once into (literal text, field name) pairs so each prompt is a
+        # single join instead of a full format() scan of the template
+        self._prompt_parts = [
+            (literal, field) for literal, field, _, _ in string.Formatter().parse(self.prompt_template)
+        ]
+
+        # prompt hash -> (stored_at, parsed response), oldest first
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _render_prompt(self, **values):
+        """Equivalent to prompt_template.format(**values) using the pre-split template."""
+        return "".join(
+            literal if field is None else literal + str(values[field])
+            for literal, field in self._prompt_parts
+        )
+
+    def _cache_key(self, prompt):
+        return hashlib.blake2b(f"{self.model_name}\n{prompt}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _cache_get(self, key):
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.monotonic() - stored_at > self.CACHE_TTL_SECONDS:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return result
+
+    def _cache_set(self, key, result):
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+        return result
     
     def generate_forecast(self, historical_data, forecast_data, latitude, longitude, date):
         """Generate a weather forecast with recommendations."""
         try:
-            # Format the data for the prompt
-            historical_data_str = json.dumps(historical_data, indent=2)
-            forecast_data_str = json.dumps(forecast_data, indent=2)
-            prompt = self.prompt_template.format(
+            # Format the data for the prompt; compact JSON keeps the prompt (and token count) small
+            historical_data_str = json.dumps(historical_data, separators=(",", ":"))
+            forecast_data_str = json.dumps(forecast_data, separators=(",", ":"))
+            prompt = self._render_prompt(
                 historical_data=historical_data_str,
                 forecast_data=forecast_data_str,
                 latitude=latitude,
@@ -105,6 +162,11 @@ class GenAIWeatherForecaster:
                 date=date
             )
 
+            cache_key = self._cache_key(prompt)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
             # Call OpenRouter
             resp_text = self.client.chat(prompt)
 
@@ -113,15 +175,15 @@ class GenAIWeatherForecaster:
                 parsed = json.loads(resp_text)
                 # Validate expected keys
                 if all(k in parsed for k in ("summary", "detailed_forecast", "precautions", "confidence_level")):
-                    return parsed
+                    return self._cache_set(cache_key, parsed)
                 else:
                     # If keys missing, wrap into fallback
-                    return {
+                    return self._cache_set(cache_key, {
                         "summary": parsed.get("summary", ""),
                         "detailed_forecast": parsed.get("detailed_forecast", str(parsed)),
                         "precautions": parsed.get("precautions", []),
                         "confidence_level": parsed.get("confidence_level", "low")
-                    }
+                    })
             except Exception:
                 # Attempt to extract JSON substring
                 try:
@@ -130,7 +192,7 @@ class GenAIWeatherForecaster:
                     if start != -1 and end != -1 and end > start:
                         candidate = resp_text[start:end+1]
                         parsed = json.loads(candidate)
-                        return parsed
+                        return self._cache_set(cache_key, parsed)
                 except Exception:
                     pass
 
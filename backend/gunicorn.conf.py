@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration for the NASA Weather Analyzer API
+Run from the backend directory with: gunicorn -c gunicorn.conf.py
+"""
+
+import os
+
+wsgi_app = "simple_app:app"
+bind = "127.0.0.1:5000"
+
+# One worker per core: each holds its own in-memory NASA and day-table caches,
+# so extra workers mostly duplicate that data; the threads below provide the
+# request concurrency. Override with WEB_CONCURRENCY.
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+# Threaded workers rather than gevent: request time is split between NASA I/O
+# and CPU-bound NumPy/Numba/scikit-learn work that greenlets cannot interleave,
+# and gevent cannot safely monkey-patch ssl after preload_app has imported it
+worker_class = "gthread"
+threads = 4
+
+# Import the app once in the master (HTTP session, compiled kernels, caches)
+# and let workers inherit it on fork
+preload_app = True
+
+# NASA fetches (30s timeout plus retries) and model training exceed the 30s default
+timeout = 120
+
+# Warm-up runs after the fork because the master must not start the fetch
+# threads itself, or children inherit dead ones. Every worker tries, but only
+# the one that takes the lock file downloads the common cities into the disk
+# cache; all workers then load them into memory on first use. Set
+# WARM_CACHE=0 to skip.
+def post_fork(server, worker):
+    if os.environ.get("WARM_CACHE", "1") != "0":
+        from simple_app import start_cache_warmup
+        start_cache_warmup()
@@ -0,0 +1,67 @@
+"""
+Disk-cached NASA POWER fetches shared by the backend test scripts
+"""
+
+import os
+import stat
+import atexit
+import time
+import hashlib
+import threading
+import requests
+
+# Keep-alive connections to NASA shared by every request in the run
+SESSION = requests.Session()
+atexit.register(SESSION.close)
+
+# Raw NASA responses are kept on disk so repeat test runs skip the network,
+# in the user's own cache directory shared with the app (files are prefixed
+# test_) rather than the shared temp dir, where others could plant responses
+NASA_CACHE_DIR = os.environ.get("POWER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "nasa_power"))
+NASA_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+
+def cache_dir_is_private():
+    """Create the cache directory if needed and check only this user can write to it.
+
+    Same rule as the app's disk cache: a directory owned by another user, or
+    group/world-writable, is refused and every response is fetched from NASA.
+    """
+    try:
+        os.makedirs(NASA_CACHE_DIR, mode=0o700, exist_ok=True)
+        st = os.lstat(NASA_CACHE_DIR)
+    except OSError as e:
+        print(f"⚠️ NASA cache dir {NASA_CACHE_DIR} is unavailable: {str(e)}")
+        return False
+    foreign_owner = hasattr(os, "getuid") and st.st_uid != os.getuid()
+    if not stat.S_ISDIR(st.st_mode) or foreign_owner or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        print(f"⚠️ Not using NASA cache dir {NASA_CACHE_DIR}: it must be a directory owned by and writable only by this user")
+        return False
+    return True
+
+
+def fetch_power_response(url, params):
+    """NASA POWER response body for these params, read from the disk cache when fresh."""
+    key = hashlib.blake2b(repr(sorted(params.items())).encode("utf-8"), digest_size=16).hexdigest()
+    path = os.path.join(NASA_CACHE_DIR, f"test_{key}.json")
+    cache_usable = cache_dir_is_private()
+    try:
+        if cache_usable and time.time() - os.path.getmtime(path) <= NASA_CACHE_TTL_SECONDS:
+            with open(path, 'rb') as f:
+                return f.read()
+    except OSError:
+        pass
+
+    response = SESSION.get(url, params=params, timeout=30)
+    response.raise_for_status()
+    if not cache_usable:
+        return response.content
+    try:
+        # Write then rename so a concurrent run (or batch thread) never reads a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return response.content
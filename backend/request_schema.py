@@ -0,0 +1,38 @@
+"""
+Request schema for /api/analyze, shared by simple_app and app
+"""
+
+import re
+from typing import Annotated
+
+import msgspec
+
+
+class AnalyzeRequest(msgspec.Struct):
+    """Body of /api/analyze, decoded and range-checked in one msgspec call."""
+    latitude: Annotated[float, msgspec.Meta(ge=-90, le=90)]
+    longitude: Annotated[float, msgspec.Meta(ge=-180, le=180)]
+    month: Annotated[int, msgspec.Meta(ge=1, le=12)]
+    day: Annotated[int, msgspec.Meta(ge=1, le=31)]
+
+
+# Per-field messages the endpoint returned before msgspec did the validation
+ANALYZE_FIELD_ERRORS = {
+    "latitude": "Invalid latitude. Must be between -90 and 90",
+    "longitude": "Invalid longitude. Must be between -180 and 180",
+    "month": "Invalid month. Must be between 1 and 12",
+    "day": "Invalid day. Must be between 1 and 31",
+}
+
+
+def analyze_request_error(error):
+    """Client-facing message for a rejected /api/analyze body."""
+    message = str(error)
+    if message.startswith("Object missing required field"):
+        return "Missing required parameters: latitude, longitude, month, day"
+    # Range failures read "Expected `float` <= 90.0 - at `$.latitude`"; type
+    # errors ("Expected `float`, got `str`") keep msgspec's own message
+    field = re.match(r"Expected `\w+` [<>]=.* - at `\$\.(\w+)`$", message)
+    if field and field.group(1) in ANALYZE_FIELD_ERRORS:
+        return ANALYZE_FIELD_ERRORS[field.group(1)]
+    return f"Invalid input data: {message}"
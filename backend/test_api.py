@@ -7,11 +7,14 @@ import requests
 import json
 import time
 
+# One keep-alive connection to the local server for all checks
+SESSION = requests.Session()
+
 def test_health_endpoint():
     """Test the health check endpoint"""
     print("🩺 Testing health endpoint...")
     try:
-        response = requests.get("http://127.0.0.1:5000/api/health", timeout=5)
+        response = SESSION.get("http://127.0.0.1:5000/api/health", timeout=5)
         if response.status_code == 200:
             print("✅ Health check passed!")
             print(f"   Response: {response.json()}")
@@ -41,7 +44,7 @@ def test_analyze_endpoint():
     
     try:
         print(f"📡 Sending request: {test_data}")
-        response = requests.post(
+        response = SESSION.post(
             "http://127.0.0.1:5000/api/analyze", 
             json=test_data,
             timeout=30
@@ -120,7 +123,7 @@ def test_error_handling():
     }
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             "http://127.0.0.1:5000/api/analyze", 
             json=invalid_data,
             timeout=10
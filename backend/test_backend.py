@@ -4,69 +4,85 @@ Test script for NASA Weather Analyzer Backend
 Tests the core functionality without running the Flask server
 """
 
+import json
 import requests
 import numpy as np
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json parser
+    orjson = None
 from datetime import datetime
+from analysis import analyze_timeseries, timeseries_arrays
+from nasa_cache import SESSION, fetch_power_response
 
-def analyze_timeseries(timeseries, month, day):
-    """Takes the full timeseries and analyzes data for a specific day of the year."""
-    try:
-        # Convert the NASA data (YYYYMMDD) into a pandas DataFrame for easy filtering
-        dates = pd.to_datetime(list(timeseries.keys()), format='%Y%m%d')
-        temps = list(timeseries.values())
-        
-        # Filter out any invalid temperatures (NASA uses -999 for missing data)
-        valid_data = [(date, temp) for date, temp in zip(dates, temps) if temp != -999]
-        
-        if not valid_data:
-            return None
-            
-        dates, temps = zip(*valid_data)
-        df = pd.DataFrame({'temperature': temps}, index=dates)
+POWER_API_URL = "https://power.larc.nasa.gov/api/temporal/daily/point"
 
-        # Filter for the specific month and day across all years
-        daily_data = df[(df.index.month == month) & (df.index.day == day)]
-        
-        if daily_data.empty or len(daily_data) < 5:  # Need at least 5 years of data
+# Concurrent NASA fetches in batch_analyze (I/O bound, so threads)
+BATCH_WORKERS = 16
+
+# Room in the shared NASA session's pool for every batch worker
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=BATCH_WORKERS))
+
+def fetch_temperature_arrays(latitude, longitude, start="20100101", end="20231231"):
+    """Daily T2M for one location as (keys, temps) arrays."""
+    params = {
+        "parameters": "T2M",
+        "community": "RE",
+        "longitude": longitude,
+        "latitude": latitude,
+        "start": start,
+        "end": end,
+        "format": "JSON"
+    }
+    body = fetch_power_response(POWER_API_URL, params)
+    nasa_data = orjson.loads(body) if orjson else json.loads(body)
+    return timeseries_arrays(nasa_data.get("properties", {}).get("parameter", {}).get("T2M", {}))
+
+def fetch_day_arrays(latitude, longitude, month, day, start_year=2010, end_year=2023):
+    """T2M for one calendar day of every year as (keys, temps) arrays.
+
+    POWER's daily endpoint only serves contiguous date ranges, so each year is
+    a single-day request; the requests run concurrently and are disk-cached
+    like any other. Years without the date (Feb 29) are skipped.
+    """
+    dates = []
+    for year in range(start_year, end_year + 1):
+        try:
+            dates.append(datetime(year, month, day).strftime('%Y%m%d'))
+        except ValueError:
+            continue
+
+    if not dates:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(dates))) as pool:
+        parts = list(pool.map(lambda date: fetch_temperature_arrays(latitude, longitude, start=date, end=date), dates))
+    return np.concatenate([keys for keys, _ in parts]), np.concatenate([temps for _, temps in parts])
+
+def batch_analyze(locations, month, day):
+    """analyze_timeseries for each (latitude, longitude), fetched concurrently.
+
+    Results come back in the order of locations, with None where the fetch
+    or the analysis failed. The analysis runs on the fetching thread: the
+    compiled kernel releases the GIL and one location's arrays are too small
+    to be worth pickling to another process.
+    """
+    def analyze_location(location):
+        try:
+            return analyze_timeseries(fetch_temperature_arrays(*location), month, day)
+        except requests.exceptions.RequestException as e:
+            print(f"❌ NASA API request failed for {location}: {str(e)}")
+            return None
+        except ValueError as e:
+            # Malformed body (orjson/json decode errors are ValueErrors) or bad values
+            print(f"❌ Invalid NASA response for {location}: {str(e)}")
             return None
 
-        # Use NumPy to calculate percentiles for our thresholds
-        all_temps = daily_data['temperature'].values
-        
-        analysis = {
-            "very_cold_threshold": round(float(np.percentile(all_temps, 10)), 2),
-            "cold_threshold": round(float(np.percentile(all_temps, 25)), 2),
-            "hot_threshold": round(float(np.percentile(all_temps, 75)), 2),
-            "very_hot_threshold": round(float(np.percentile(all_temps, 90)), 2),
-            "average_temp": round(float(np.mean(all_temps)), 2),
-            "median_temp": round(float(np.median(all_temps)), 2),
-            "min_temp": round(float(np.min(all_temps)), 2),
-            "max_temp": round(float(np.max(all_temps)), 2),
-            "data_points": len(all_temps),
-            "unit": "°C",
-            "date_analyzed": f"{month:02d}/{day:02d}",
-            "years_of_data": f"{df.index.year.min()}-{df.index.year.max()}"
-        }
-        
-        # Calculate probabilities for different conditions
-        very_hot_prob = (all_temps >= analysis["very_hot_threshold"]).mean() * 100
-        hot_prob = (all_temps >= analysis["hot_threshold"]).mean() * 100
-        cold_prob = (all_temps <= analysis["cold_threshold"]).mean() * 100
-        very_cold_prob = (all_temps <= analysis["very_cold_threshold"]).mean() * 100
-        
-        analysis.update({
-            "very_hot_probability": round(very_hot_prob, 1),
-            "hot_probability": round(hot_prob, 1),
-            "cold_probability": round(cold_prob, 1),
-            "very_cold_probability": round(very_cold_prob, 1)
-        })
-        
-        return analysis
-        
-    except Exception as e:
-        print(f"Error analyzing timeseries: {str(e)}")
-        return None
+    if not locations:
+        return []
+    with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(locations))) as pool:
+        return list(pool.map(analyze_location, locations))
 
 def test_nasa_api():
     """Test connection to NASA POWER API"""
@@ -78,41 +94,26 @@ def test_nasa_api():
     month = 7
     day = 15
     
-    POWER_API_URL = "https://power.larc.nasa.gov/api/temporal/daily/point"
-    
-    params = {
-        "parameters": "T2M",  # Temperature only for testing
-        "community": "RE",
-        "longitude": longitude,
-        "latitude": latitude,
-        "start": "20100101",  # Use a longer range to ensure enough years for percentiles
-        "end": "20231231",
-        "format": "JSON"
-    }
-    
     try:
         print(f"📍 Testing location: {latitude}°N, {longitude}°W")
         print(f"📅 Testing date: {month:02d}/{day:02d}")
         print("🔄 Fetching data from NASA API...")
         
-        response = requests.get(POWER_API_URL, params=params, timeout=30)
-        response.raise_for_status()
-        nasa_data = response.json()
+        # Only the tested day of each year (2010-2023, enough years for percentiles)
+        # is downloaded, not every day of the range
+        key_ints, temps = fetch_day_arrays(latitude, longitude, month, day)
         
         print("✅ NASA API connection successful!")
         
-        # Extract temperature data
-        temp_data = nasa_data.get("properties", {}).get("parameter", {}).get("T2M", {})
-        
-        if not temp_data:
+        if len(key_ints) == 0:
             print("❌ No temperature data found")
             return False
             
-        print(f"📊 Data points received: {len(temp_data)}")
+        print(f"📊 Data points received: {len(key_ints)}")
         
         # Test analysis
         print("🔬 Testing weather analysis...")
-        analysis = analyze_timeseries(temp_data, month, day)
+        analysis = analyze_timeseries((key_ints, temps), month, day)
         
         if analysis:
             print("✅ Analysis successful!")
@@ -139,21 +140,11 @@ def test_nasa_api():
         print(f"❌ Unexpected error: {str(e)}")
         return False
 
-if __name__ == "__main__":
+def main():
+    """Run the backend checks and print a summary"""
     print("🚀 NASA Weather Analyzer Backend Test")
     print("=" * 50)
     
-    # Test dependencies
-    print("🔍 Checking dependencies...")
-    try:
-        import numpy as np
-        import pandas as pd
-        import requests
-        print("✅ All dependencies available")
-    except ImportError as e:
-        print(f"❌ Missing dependency: {e}")
-        exit(1)
-    
     # Test NASA API
     success = test_nasa_api()
     
@@ -164,3 +155,8 @@ if __name__ == "__main__":
     else:
         print("\n❌ Backend test failed")
         print("🔧 Please check your internet connection and try again.")
+    
+    return success
+
+if __name__ == "__main__":
+    main()
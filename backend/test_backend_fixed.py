@@ -3,88 +3,14 @@
 Fixed Test script for NASA Weather Analyzer Backend
 """
 
+import json
 import requests
-import numpy as np
-import pandas as pd
-from datetime import datetime
-
-def analyze_timeseries_debug(timeseries, month, day):
-    """Debug version of analyze_timeseries"""
-    print(f"🔍 Debug: Analyzing data for {month:02d}/{day:02d}")
-    print(f"📊 Total data points: {len(timeseries)}")
-    
-    try:
-        # Convert the NASA data (YYYYMMDD) into a pandas DataFrame for easy filtering
-        dates = pd.to_datetime(list(timeseries.keys()), format='%Y%m%d')
-        temps = list(timeseries.values())
-        
-        print(f"📅 Date range: {dates.min()} to {dates.max()}")
-        
-        # Filter out any invalid temperatures (NASA uses -999 for missing data)
-        valid_data = [(date, temp) for date, temp in zip(dates, temps) if temp != -999 and temp is not None]
-        print(f"✅ Valid data points after filtering: {len(valid_data)}")
-        
-        if not valid_data:
-            print("❌ No valid data after filtering")
-            return None
-            
-        dates, temps = zip(*valid_data)
-        df = pd.DataFrame({'temperature': temps}, index=dates)
-
-        # Filter for the specific month and day across all years
-        print(f"🔍 Filtering for month {month}, day {day}")
-        daily_data = df[(df.index.month == month) & (df.index.day == day)]
-        
-        print(f"📊 Daily data for {month:02d}/{day:02d}: {len(daily_data)} points")
-        if not daily_data.empty:
-            print(f"📈 Daily temperatures: {daily_data['temperature'].tolist()}")
-        
-        if daily_data.empty:
-            print(f"❌ No data found for {month:02d}/{day:02d}")
-            return None
-            
-        if len(daily_data) < 3:  # Reduced threshold for testing
-            print(f"❌ Not enough data points ({len(daily_data)} < 3)")
-            return None
-
-        # Use NumPy to calculate percentiles for our thresholds
-        all_temps = daily_data['temperature'].values
-        
-        analysis = {
-            "very_cold_threshold": round(float(np.percentile(all_temps, 10)), 2),
-            "cold_threshold": round(float(np.percentile(all_temps, 25)), 2),
-            "hot_threshold": round(float(np.percentile(all_temps, 75)), 2),
-            "very_hot_threshold": round(float(np.percentile(all_temps, 90)), 2),
-            "average_temp": round(float(np.mean(all_temps)), 2),
-            "median_temp": round(float(np.median(all_temps)), 2),
-            "min_temp": round(float(np.min(all_temps)), 2),
-            "max_temp": round(float(np.max(all_temps)), 2),
-            "data_points": len(all_temps),
-            "unit": "°C",
-            "date_analyzed": f"{month:02d}/{day:02d}",
-            "years_of_data": f"{df.index.year.min()}-{df.index.year.max()}"
-        }
-        
-        # Calculate probabilities for different conditions
-        very_hot_prob = (all_temps >= analysis["very_hot_threshold"]).mean() * 100
-        hot_prob = (all_temps >= analysis["hot_threshold"]).mean() * 100
-        cold_prob = (all_temps <= analysis["cold_threshold"]).mean() * 100
-        very_cold_prob = (all_temps <= analysis["very_cold_threshold"]).mean() * 100
-        
-        analysis.update({
-            "very_hot_probability": round(very_hot_prob, 1),
-            "hot_probability": round(hot_prob, 1),
-            "cold_probability": round(cold_prob, 1),
-            "very_cold_probability": round(very_cold_prob, 1)
-        })
-        
-        return analysis
-        
-    except Exception as e:
-        print(f"❌ Error in analysis: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return None
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json parser
+    orjson = None
+from analysis import analyze_timeseries, timeseries_arrays
+from nasa_cache import fetch_power_response
 
 def test_nasa_api_fixed():
     """Test connection to NASA POWER API with better parameters"""
@@ -114,9 +40,8 @@ def test_nasa_api_fixed():
         print(f"📅 Testing date: {month:02d}/{day:02d}")
         print("🔄 Fetching data from NASA API...")
         
-        response = requests.get(POWER_API_URL, params=params, timeout=30)
-        response.raise_for_status()
-        nasa_data = response.json()
+        body = fetch_power_response(POWER_API_URL, params)
+        nasa_data = orjson.loads(body) if orjson else json.loads(body)
         
         print("✅ NASA API connection successful!")
         
@@ -131,7 +56,7 @@ def test_nasa_api_fixed():
         
         # Test analysis with debugging
         print("🔬 Testing weather analysis...")
-        analysis = analyze_timeseries_debug(temp_data, month, day)
+        analysis = analyze_timeseries(timeseries_arrays(temp_data), month, day, debug=True, min_points=3)  # Reduced threshold for testing
         
         if analysis:
             print("✅ Analysis successful!")
@@ -160,21 +85,11 @@ def test_nasa_api_fixed():
         traceback.print_exc()
         return False
 
-if __name__ == "__main__":
+def main():
+    """Run the backend checks with debug output and print a summary"""
     print("🚀 NASA Weather Analyzer Backend Test (Fixed)")
     print("=" * 50)
     
-    # Test dependencies
-    print("🔍 Checking dependencies...")
-    try:
-        import numpy as np
-        import pandas as pd
-        import requests
-        print("✅ All dependencies available")
-    except ImportError as e:
-        print(f"❌ Missing dependency: {e}")
-        exit(1)
-    
     # Test NASA API
     success = test_nasa_api_fixed()
     
@@ -184,3 +99,8 @@ if __name__ == "__main__":
     else:
         print("\n❌ Backend test failed")
         print("🔧 Please check the debug output above.")
+    
+    return success
+
+if __name__ == "__main__":
+    main()
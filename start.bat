@@ -41,7 +41,7 @@ echo 📡 Starting backend server...
 
 REM Start backend server
 cd backend
-start "NASA Backend" cmd /k "python simple_app.py"
+start "NASA Backend" cmd /k "python dev.py"
 cd ..
 
 echo 🌐 Starting frontend server...
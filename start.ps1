@@ -39,7 +39,7 @@ Write-Host "📡 Starting backend server (Flask)..." -ForegroundColor Yellow
 $backendJob = Start-Job -ScriptBlock {
     Set-Location $args[0]
     cd backend
-    python simple_app.py
+    python dev.py
 } -ArgumentList (Get-Location)
 
 Start-Sleep -Seconds 3